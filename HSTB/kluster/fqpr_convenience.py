@@ -448,6 +448,8 @@ def _add_points_to_surface(fqpr_inst: Fqpr, bgrid: BathyGrid, fqpr_crs: int, fqp
             # filter out rejected soundings, i.e. where detectioninfo = 2
             data = data.where(data['detectioninfo'] != kluster_variables.rejected_flag, drop=True)
             data = data.drop_vars(['detectioninfo'])
+            # containers are named '{cont_name}_{idx}', FqprProject.return_surface_containers relies on this to strip
+            #   the index and get back to the fqpr container name
             bgrid.add_points(data, '{}_{}'.format(cont_name, cont_name_idx), multibeamfiles, fqpr_crs, fqpr_vertref,
                              min_time=mintime, max_time=maxtime)
             cont_name_idx += 1
@@ -1,6 +1,9 @@
 import os
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import xarray as xr
+import dask
 import json
 from typing import Union
 from datetime import datetime, timezone
@@ -11,8 +14,15 @@ from HSTB.kluster.dask_helpers import dask_find_or_start_client, client_needs_re
 from HSTB.kluster.fqpr_convenience import reload_data, reload_surface, get_attributes_from_fqpr
 from HSTB.kluster.xarray_helpers import slice_xarray_by_dim
 from HSTB.kluster.fqpr_vessel import VesselFile, create_new_vessel_file, convert_from_fqpr_xyzrph
+from HSTB.kluster import kluster_variables
 from bathygrid.bgrid import BathyGrid
 
+try:  # orjson is much faster than the stdlib json, use it for the project file if it is installed
+    import orjson
+    orjson_found = True
+except ModuleNotFoundError:
+    orjson_found = False
+
 
 class FqprProject:
     """
@@ -49,11 +59,14 @@ class FqprProject:
         """
 
         self.client = None
-        self.path = None
+        self._path = None
+        self._project_dir = None
         self.is_gui = is_gui
         self.file_format = 1.0
 
         self.vessel_file = None
+        # (vessel file path, modified time in nanoseconds, size in bytes, VesselFile instance), see return_vessel_file
+        self._vessel_file_cache = None
 
         # all paths are relative to the project file location...
 
@@ -73,9 +86,19 @@ class FqprProject:
         # ex: {'EM2040\\convert1': {'frequency_identifier': [260000, 320000, 290000], ...}
         self.fqpr_attrs = {}
 
-        # converted folder path per line name, see regenerate_fqpr_lines
+        # converted folder paths per (primary, secondary) serial number, see get_fqpr_by_serial_number
+        # ex: {(40111, 0): ['EM2040\\convert1']}
+        self._serial_index = {}
+        # time of the first ping per converted folder path, see get_fqpr_by_serial_number
+        # ex: {'EM2040\\convert1': 1503413148.045}
+        self._fqpr_first_time = {}
+        # container name (the name of the converted folder) per converted folder path, see return_surface_containers
+        # ex: {'EM2040\\convert1': 'convert1'}
+        self._container_names = {}
+
+        # converted folder path per line name, rebuilt from fqpr_lines whenever it changes, see convert_path_lookup
         # ex: {'0001_20170822_144548_S5401_X.all': 'EM2040\\convert1'}
-        self.convert_path_lookup = {}
+        self._convert_path_lookup = {}
 
         # project settings, like the chosen vertical reference
         # ex: {'use_epsg': True, 'epsg': 26910, ...}
@@ -85,8 +108,62 @@ class FqprProject:
         self.point_cloud_for_line = {}
         self.node_vals_for_surf = {}
 
+        # latitude/longitude boundaries per line name, see return_line_bounds
+        # ex: {'0001_20170822_144548_S5401_X.all': (47.78, 47.80, -122.48, -122.46)}
+        self.line_bounds = {}
+
         self._project_observers = []
 
+        # cached path conversions, keyed on the provided path, see path_relative_to_project/absolute_path_from_relative
+        self._rel_cache = {}
+        self._abs_cache = {}
+
+        # cached list of the fqpr_instances/surface_instances keys, reset when instances are added or removed
+        self._fqpr_paths_cache = None
+        self._surface_paths_cache = None
+
+    @property
+    def path(self):
+        """
+        path to the kluster_project.json project file, all stored paths are relative to the directory containing this file
+        """
+
+        return self._path
+
+    @path.setter
+    def path(self, pth: str):
+        """
+        path setter, resets the cached project directory and the cached relative/absolute path conversions
+
+        Parameters
+        ----------
+        pth
+            path to the project file
+        """
+
+        self._path = pth
+        self._project_dir = os.path.dirname(pth) if pth is not None else None
+        self._rel_cache.clear()
+        self._abs_cache.clear()
+
+    @property
+    def convert_path_lookup(self):
+        """
+        converted folder path per line name.  Derived from fqpr_lines, see _rebuild_convert_path_lookup.  The
+        returned dict is never modified in place, so it is safe to read from worker threads (DrawNavigationWorker)
+        while fqpr instances are added or removed on the main thread.
+        """
+
+        return self._convert_path_lookup
+
+    def _rebuild_convert_path_lookup(self):
+        """
+        Build a new convert_path_lookup from fqpr_lines and swap it in with a single assignment.  Must be called from
+        the thread that modifies fqpr_lines, after every change to fqpr_lines.
+        """
+
+        self._convert_path_lookup = {linename: pth for pth, lines in self.fqpr_lines.items() for linename in lines}
+
     def path_relative_to_project(self, pth: str):
         """
         Return the relative path for the provided pth from the project file
@@ -103,7 +180,11 @@ class FqprProject:
         """
         if self.path is None:
             raise ValueError('FqprProject: path to project file not setup, is currently undefined.')
-        return os.path.relpath(pth, os.path.dirname(self.path))
+        relpath = self._rel_cache.get(pth)
+        if relpath is None:
+            relpath = os.path.relpath(pth, self._project_dir)
+            self._rel_cache[pth] = relpath
+        return relpath
 
     def absolute_path_from_relative(self, pth: str):
         """
@@ -123,7 +204,11 @@ class FqprProject:
 
         if self.path is None:
             raise ValueError('FqprProject: path to project file not setup, is currently undefined.')
-        return os.path.abspath(os.path.join(os.path.dirname(self.path), pth))
+        abspath = self._abs_cache.get(pth)
+        if abspath is None:
+            abspath = os.path.abspath(os.path.join(self._project_dir, pth))
+            self._abs_cache[pth] = abspath
+        return abspath
 
     def _setup_new_project(self, pth: str):
         """
@@ -131,6 +216,9 @@ class FqprProject:
 
         Give the path to the project folder, all stored paths to fqpr instances will be relative to this path
 
+        If there is already a project file there, it is opened, so that the next save_project does not overwrite the
+        existing fqpr/surface paths and settings with only what is loaded in this project.
+
         Parameters
         ----------
         pth
@@ -139,9 +227,14 @@ class FqprProject:
         """
         if self.path is None:
             if os.path.isdir(pth):  # user provided a directory
-                self.path = os.path.join(pth, 'kluster_project.json')
+                projfile = os.path.join(pth, 'kluster_project.json')
             else:
-                self.path = pth
+                projfile = pth
+            if os.path.exists(projfile):
+                print('Found existing project file, opening {}'.format(projfile))
+                self.open_project(projfile, skip_dask=True)
+            else:
+                self.path = projfile
 
     def _load_project_file(self, projfile: str):
         """
@@ -160,8 +253,12 @@ class FqprProject:
 
         if os.path.split(projfile)[1] != 'kluster_project.json':
             raise IOError('Expected a file named kluster_project.json, found {}'.format(projfile))
-        with open(projfile, 'r') as pf:
-            data = json.load(pf)
+        if orjson_found:
+            with open(projfile, 'rb') as pf:
+                data = orjson.loads(pf.read())
+        else:
+            with open(projfile, 'r', encoding='utf-8') as pf:
+                data = json.load(pf)
         # now translate the relative paths to absolute
         self.path = projfile
         if 'vessel_file' in data:
@@ -173,13 +270,8 @@ class FqprProject:
                     data['vessel_file'] = None
         else:
             data['vessel_file'] = None
-        data['fqpr_paths'] = [self.absolute_path_from_relative(f) for f in data['fqpr_paths']]
-        data['surface_paths'] = [self.absolute_path_from_relative(f) for f in data['surface_paths']]
         for ky in ['fqpr_paths', 'surface_paths']:
-            for fil in data[ky]:
-                if not os.path.exists(fil):
-                    print('Unable to find {}'.format(fil))
-                    data[ky].remove(fil)
+            data[ky] = [fil for fil in (self.absolute_path_from_relative(f) for f in data[ky]) if _path_exists_or_warn(fil)]
         return data
 
     def _bind_to_project_updated(self, callback: FunctionType):
@@ -208,7 +300,7 @@ class FqprProject:
         needs_restart = client_needs_restart(self.client)  # handle memory leaks by restarting if memory utilization on fresh client is > 50%
         if needs_restart:
             self.client.restart()
-        for fqname, fqinstance in self.fqpr_instances.items():
+        for fqinstance in self.fqpr_instances.values():
             fqinstance.client = self.client
             fqinstance.multibeam.client = self.client
         return self.client
@@ -224,12 +316,10 @@ class FqprProject:
             Path to a directory that is either empty or has converted data in it
         """
 
-        for fil in os.listdir(directory_path):
-            full_path = os.path.join(directory_path, fil)
-            if os.path.isdir(full_path):
-                self.add_fqpr(full_path, skip_dask=True)
-            # elif os.path.isfile(full_path):  # skip trying to load surfaces, we don't have a good way to tell, could just try except i guess
-            #     self.add_surface(full_path)
+        with os.scandir(directory_path) as dir_entries:
+            # skip trying to load surfaces, we don't have a good way to tell, could just try except i guess
+            folders = [entry.path for entry in dir_entries if entry.is_dir()]
+        self._add_fqprs_in_parallel(folders, skip_dask=True)
         self.path = os.path.join(directory_path, 'kluster_project.json')
         self.save_project()
 
@@ -240,24 +330,18 @@ class FqprProject:
 
         if self.path is None:
             raise EnvironmentError('kluster_project save_project - no data found, you must add data before saving a project')
-        if os.path.exists(self.path):
-            try:
-                data = self._load_project_file(self.path)
-                data['fqpr_paths'] = [self.path_relative_to_project(pth) for pth in data['fqpr_paths']]
-                data['surface_paths'] = [self.path_relative_to_project(pth) for pth in data['surface_paths']]
-            except:
-                print('Warning: Unable to read from project file: {}'.format(self.path))
-                data = {'fqpr_paths': [], 'surface_paths': [], 'vessel_file': None}
+        # the loaded fqpr/surface instances are the authority, no need to read and merge the existing project file
+        data = {'fqpr_paths': self.return_fqpr_paths(), 'surface_paths': self.return_surface_paths(),
+                'vessel_file': None, 'file_format': self.file_format}
+        if self.vessel_file:
+            data['vessel_file'] = self.path_relative_to_project(self.vessel_file)
+        data.update(self.settings)
+        if orjson_found:
+            with open(self.path, 'wb') as pf:
+                pf.write(orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2))
         else:
-            data = {'fqpr_paths': [], 'surface_paths': [], 'vessel_file': None}
-        with open(self.path, 'w') as pf:
-            data['fqpr_paths'] = list(set(self.return_fqpr_paths() + data['fqpr_paths']))
-            data['surface_paths'] = list(set(self.return_surface_paths() + data['surface_paths']))
-            data['file_format'] = self.file_format
-            if self.vessel_file:
-                data['vessel_file'] = self.path_relative_to_project(self.vessel_file)
-            data.update(self.settings)
-            json.dump(data, pf, sort_keys=True, indent=4)
+            with open(self.path, 'w', encoding='utf-8') as pf:  # matches the orjson output byte for byte
+                json.dump(data, pf, sort_keys=True, indent=2, ensure_ascii=False)
         print('Project saved to {}'.format(self.path))
 
     def open_project(self, projfile: str, skip_dask: bool = False):
@@ -276,11 +360,8 @@ class FqprProject:
         self.path = projfile
         self.file_format = data['file_format']
 
-        for pth in data['fqpr_paths']:
-            if os.path.exists(pth):
-                self.add_fqpr(pth, skip_dask=skip_dask)
-            else:  # invalid path
-                print('Unable to find converted data: {}'.format(pth))
+        # missing paths have already been removed by _load_project_file
+        self._add_fqprs_in_parallel(data['fqpr_paths'], skip_dask=skip_dask)
 
         for pth in data['surface_paths']:
             if os.path.exists(pth):
@@ -320,7 +401,7 @@ class FqprProject:
         self.vessel_file = vessel_file
         if update_with_project:
             vess_file = self.return_vessel_file()
-            for fq, fqpr in self.fqpr_instances.items():
+            for fqpr in self.fqpr_instances.values():
                 serial_number = fqpr.multibeam.raw_ping[0].system_identifier
                 sonar_type = fqpr.multibeam.raw_ping[0].sonartype
                 output_identifier = os.path.split(fqpr.output_folder)[1]
@@ -332,19 +413,26 @@ class FqprProject:
         """
         close project and clear all data.  have to close the fqpr instances with the fqpr close method.
         """
-        for fq, fqinst in self.fqpr_instances.items():
+        for fqinst in self.fqpr_instances.values():
             fqinst.close()
 
         self.path = None
         self.vessel_file = None
-        self.surface_instances = {}
-        self.fqpr_instances = {}
-        self.fqpr_lines = {}
-        self.fqpr_attrs = {}
-        self.convert_path_lookup = {}
-        self.buffered_fqpr_navigation = {}
-        self.point_cloud_for_line = {}
-        self.node_vals_for_surf = {}
+        self._vessel_file_cache = None
+        self.surface_instances.clear()
+        self.fqpr_instances.clear()
+        self.fqpr_lines.clear()
+        self.fqpr_attrs.clear()
+        self._serial_index.clear()
+        self._fqpr_first_time.clear()
+        self._container_names.clear()
+        self._convert_path_lookup = {}
+        self.buffered_fqpr_navigation.clear()
+        self.point_cloud_for_line.clear()
+        self.node_vals_for_surf.clear()
+        self.line_bounds.clear()
+        self._fqpr_paths_cache = None
+        self._surface_paths_cache = None
 
     def set_settings(self, settings: dict):
         """
@@ -362,7 +450,7 @@ class FqprProject:
         """
         self.settings.update(settings)
         if 'parallel_write' in settings:
-            for relpath, fqpr_instance in self.fqpr_instances.items():
+            for fqpr_instance in self.fqpr_instances.values():
                 fqpr_instance.parallel_write = settings['parallel_write']
         self.save_project()
 
@@ -385,29 +473,84 @@ class FqprProject:
             False if the fqpr was already in the project, True if added
         """
 
-        if type(pth) == str:
+        if isinstance(pth, str):
             fq = reload_data(pth, skip_dask=skip_dask, silent=True, show_progress=not self.is_gui)
         else:  # pth is the new Fqpr instance, pull the actual path from the Fqpr attribution
             fq = pth
             pth = os.path.normpath(fq.multibeam.raw_ping[0].output_path)
 
         if fq is not None:
-            if self.path is None:
-                self._setup_new_project(os.path.dirname(pth))
-            relpath = self.path_relative_to_project(pth)
-            if relpath in self.fqpr_instances:
-                already_in = True
-            else:
-                already_in = False
-            self.fqpr_instances[relpath] = fq
-            self.fqpr_attrs[relpath] = get_attributes_from_fqpr(fq, include_mode=False)
-            self.regenerate_fqpr_lines(relpath)
-            for callback in self._project_observers:
-                callback(True)
-            print('Successfully added {}'.format(pth))
-            return relpath, already_in
+            return self._add_fqpr_from_loaded(pth, fq)
         return None, False
 
+    def _add_fqpr_from_loaded(self, pth: str, fq: Fqpr):
+        """
+        Register an already loaded Fqpr object with this project, see add_fqpr
+
+        Parameters
+        ----------
+        pth
+            path to the top level folder for the Fqpr project
+        fq
+            the loaded Fqpr instance
+
+        Returns
+        -------
+        str
+            project entry in the dictionary, will be the relative path to the kluster data store from the project file
+        bool
+            False if the fqpr was already in the project, True if added
+        """
+
+        if self.path is None:
+            self._setup_new_project(os.path.dirname(pth))
+        relpath = self.path_relative_to_project(pth)
+        if relpath in self.fqpr_instances:
+            already_in = True
+        else:
+            already_in = False
+        self.fqpr_instances[relpath] = fq
+        self._fqpr_paths_cache = None
+        self.fqpr_attrs[relpath] = get_attributes_from_fqpr(fq, include_mode=False)
+        self._container_names[relpath] = os.path.basename(fq.multibeam.raw_ping[0].output_path)
+        self._index_serial_numbers(relpath, fq)
+        self.regenerate_fqpr_lines(relpath)
+        for callback in self._project_observers:
+            callback(True)
+        print('Successfully added {}'.format(pth))
+        return relpath, already_in
+
+    def _add_fqprs_in_parallel(self, pths: list, skip_dask: bool = False):
+        """
+        Reload the converted data for each of the provided paths using a pool of threads, as reading the zarr stores
+        is I/O bound.  The loaded Fqpr objects are then added to the project one at a time in this thread.
+
+        Data is always reloaded without a dask client, the client is set afterwards (see get_dask_client) so that
+        the threads do not each try to find or start one.
+
+        Parameters
+        ----------
+        pths
+            list of paths to the top level folder for each Fqpr project
+        skip_dask
+            if True will skip auto starting a dask LocalCluster
+        """
+
+        if not pths:
+            return
+        max_workers = min(kluster_variables.max_project_load_workers, len(pths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = list(executor.map(lambda pth: reload_data(pth, skip_dask=True, silent=True, show_progress=not self.is_gui), pths))
+        added = False
+        for pth, fq in zip(pths, loaded):
+            if fq is not None:
+                self._add_fqpr_from_loaded(pth, fq)
+                added = True
+        if added:
+            self._check_serial_number_index()
+            if not skip_dask:
+                self.get_dask_client()
+
     def remove_fqpr(self, pth: str, relative_path: bool = False):
         """
         Remove an attached Fqpr instance from the project by path to Fqpr converted folder
@@ -428,24 +571,62 @@ class FqprProject:
         if relpath in self.fqpr_instances:
             self.fqpr_instances[relpath].close(close_dask=False)
             self.fqpr_instances.pop(relpath)
+            self._fqpr_paths_cache = None
+            self._container_names.pop(relpath, None)
+            self._unindex_serial_numbers(relpath)
             if relpath in self.fqpr_attrs:
                 self.fqpr_attrs.pop(relpath)
             else:
                 print('Warning: On removing from project, unable to find attributes for {}'.format(relpath))
-            for linename in self.fqpr_lines[relpath]:
-                if linename in self.convert_path_lookup:
-                    self.convert_path_lookup.pop(linename)
-                else:
-                    print('Warning: On removing from project, unable to find loaded line attributes for {} in {}'.format(linename, relpath))
-            if relpath in self.fqpr_lines:
-                self.fqpr_lines.pop(relpath)
-            else:
+            if self.fqpr_lines.pop(relpath, None) is None:
                 print('Warning: On removing from project, unable to find loaded lines for {}'.format(relpath))
+            else:
+                self._rebuild_convert_path_lookup()
             for callback in self._project_observers:
                 callback(True)
         else:
             print('Unable to remove instance {}'.format(relpath))
 
+    def _index_serial_numbers(self, relpath: str, fq: Fqpr):
+        """
+        Add the provided Fqpr instance to the serial number index and store the time of the first ping, see
+        get_fqpr_by_serial_number
+
+        Parameters
+        ----------
+        relpath
+            project entry for the Fqpr instance, the relative path to the kluster data store from the project file
+        fq
+            the loaded Fqpr instance
+        """
+
+        self._unindex_serial_numbers(relpath)
+        first_ping = fq.multibeam.raw_ping[0]
+        for primary_serial_number in first_ping.system_serial_number:
+            for secondary_serial_number in first_ping.secondary_system_serial_number:
+                key = (int(primary_serial_number), int(secondary_serial_number))
+                self._serial_index.setdefault(key, []).append(relpath)
+        self._fqpr_first_time[relpath] = float(first_ping.time.values[0])
+
+    def _unindex_serial_numbers(self, relpath: str):
+        """
+        Remove the provided project entry from the serial number index, see _index_serial_numbers
+
+        Parameters
+        ----------
+        relpath
+            project entry for the Fqpr instance, the relative path to the kluster data store from the project file
+        """
+
+        if self._fqpr_first_time.pop(relpath, None) is None:
+            return
+        for key in list(self._serial_index.keys()):
+            pths = self._serial_index[key]
+            if relpath in pths:
+                pths.remove(relpath)
+                if not pths:
+                    self._serial_index.pop(key)
+
     def refresh_fqpr_attribution(self, pth: str, relative_path: bool = False):
         if relative_path:
             relpath = pth
@@ -468,7 +649,7 @@ class FqprProject:
             path to surface file or existing Bathygrid object
         """
 
-        if type(pth) == str:
+        if isinstance(pth, str):
             bg = reload_surface(pth)
             pth = os.path.normpath(pth)
         else:  # fq is the new Fqpr instance, pth is the output path that is saved as an attribute
@@ -479,6 +660,7 @@ class FqprProject:
                 self._setup_new_project(os.path.dirname(pth))
             relpath = self.path_relative_to_project(pth)
             self.surface_instances[relpath] = bg
+            self._surface_paths_cache = None
             print('Successfully added {}'.format(pth))
 
     def remove_surface(self, pth: str, relative_path: bool = False):
@@ -500,6 +682,7 @@ class FqprProject:
 
         if relpath in self.surface_instances:
             self.surface_instances.pop(relpath)
+            self._surface_paths_cache = None
 
     def build_raw_attitude_for_line(self, line: str, subset: bool = True):
         """
@@ -539,11 +722,11 @@ class FqprProject:
         pth
             path to the Fqpr object
         """
-        for fq_name, fq_inst in self.fqpr_instances.items():
-            if fq_name == pth:
-                self.fqpr_lines[fq_name] = fq_inst.return_line_dict()
-                for linename in self.fqpr_lines[fq_name]:
-                    self.convert_path_lookup[linename] = pth
+        fq_inst = self.fqpr_instances.get(pth)
+        if fq_inst is None:
+            return
+        self.fqpr_lines[pth] = fq_inst.return_line_dict()
+        self._rebuild_convert_path_lookup()
 
     def build_visualizations(self, pth: str, visualization_type: str):
         """
@@ -557,16 +740,17 @@ class FqprProject:
             one of 'orientation', 'beam_vectors', 'corrected_beam_vectors'
         """
 
-        for fq_name, fq_inst in self.fqpr_instances.items():
-            if fq_name == pth:
-                if visualization_type == 'orientation':
-                    fq_inst.plot.visualize_orientation_vector()
-                elif visualization_type == 'beam_vectors':
-                    fq_inst.plot.visualize_beam_pointing_vectors(corrected=False)
-                elif visualization_type == 'corrected_beam_vectors':
-                    fq_inst.plot.visualize_beam_pointing_vectors(corrected=True)
-                else:
-                    raise ValueError("Expected one of 'orientation', 'beam_vectors', 'corrected_beam_vectors', got {}".format(visualization_type))
+        fq_inst = self.fqpr_instances.get(pth)
+        if fq_inst is None:
+            return
+        if visualization_type == 'orientation':
+            fq_inst.plot.visualize_orientation_vector()
+        elif visualization_type == 'beam_vectors':
+            fq_inst.plot.visualize_beam_pointing_vectors(corrected=False)
+        elif visualization_type == 'corrected_beam_vectors':
+            fq_inst.plot.visualize_beam_pointing_vectors(corrected=True)
+        else:
+            raise ValueError("Expected one of 'orientation', 'beam_vectors', 'corrected_beam_vectors', got {}".format(visualization_type))
 
     def return_line_owner(self, line: str):
         """
@@ -597,10 +781,11 @@ class FqprProject:
         Returns
         -------
         list
-            list of str paths to all surface instances
+            list of str paths to all surface instances, this list is cached and should not be modified
         """
-        pths = list(self.surface_instances.keys())
-        return pths
+        if self._surface_paths_cache is None:
+            self._surface_paths_cache = list(self.surface_instances.keys())
+        return self._surface_paths_cache
 
     def return_fqpr_paths(self):
         """
@@ -609,10 +794,11 @@ class FqprProject:
         Returns
         -------
         list
-            list of str paths to all fqpr instances
+            list of str paths to all fqpr instances, this list is cached and should not be modified
         """
-        pths = list(self.fqpr_instances.keys())
-        return pths
+        if self._fqpr_paths_cache is None:
+            self._fqpr_paths_cache = list(self.fqpr_instances.keys())
+        return self._fqpr_paths_cache
 
     def return_fqpr_instances(self):
         """
@@ -644,7 +830,7 @@ class FqprProject:
         """
 
         if proj is not None:
-            if type(proj) is str:
+            if isinstance(proj, str):
                 if relative_path:
                     return self.fqpr_lines[proj]
                 else:
@@ -664,11 +850,7 @@ class FqprProject:
             sorted list of line names
         """
 
-        total_lines = []
-        for fq_proj in self.fqpr_lines:
-            for fq_line in self.fqpr_lines[fq_proj]:
-                total_lines.append(fq_line)
-        return sorted(total_lines)
+        return sorted(chain.from_iterable(self.fqpr_lines.values()))
 
     def return_line_navigation(self, line: str):
         """
@@ -687,19 +869,25 @@ class FqprProject:
             longitude values (geographic) downsampled in degrees
         """
 
-        if line not in self.buffered_fqpr_navigation:
+        buffered = self.buffered_fqpr_navigation.get(line)
+        if buffered is None:
             fq_inst = self.return_line_owner(line)
             if fq_inst is not None:
                 line_start_time, line_end_time = fq_inst.multibeam.raw_ping[0].multibeam_files[line]
                 nav = fq_inst.multibeam.return_raw_navigation(line_start_time, line_end_time)
                 lat, lon = nav.latitude.values, nav.longitude.values
+                # bounds from the full resolution navigation, so that spatial queries remain exact
+                self.line_bounds[line] = (float(lat.min()), float(lat.max()), float(lon.min()), float(lon.max()))
+                # downsample for display, no need to hold on to more points than we can draw
+                step = max(1, int(np.ceil(lat.size / kluster_variables.max_line_navigation_points)))
+                lat, lon = lat[::step], lon[::step]
                 # save nav so we don't have to redo this routine if asked for the same line
-                self.buffered_fqpr_navigation[line] = [lat, lon]
+                self.buffered_fqpr_navigation[line] = (lat, lon)
             else:
                 print('{} not found in project'.format(line))
                 return None, None
         else:
-            lat, lon = self.buffered_fqpr_navigation[line]
+            lat, lon = buffered
         return lat, lon
 
     def return_lines_in_box(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float):
@@ -725,20 +913,41 @@ class FqprProject:
 
         lines_in_box = []
 
-        for fq_proj in self.fqpr_lines:
-            for fq_line in self.fqpr_lines[fq_proj]:
-                lats, lons = self.return_line_navigation(fq_line)
-
-                line_min_lat = np.min(lats)
-                line_max_lat = np.max(lats)
-                line_min_lon = np.min(lons)
-                line_max_lon = np.max(lons)
-
+        for fq_lines in self.fqpr_lines.values():
+            for fq_line in fq_lines:
+                bounds = self.return_line_bounds(fq_line)
+                if bounds is None:
+                    continue
+                line_min_lat, line_max_lat, line_min_lon, line_max_lon = bounds
                 if (line_max_lat < max_lat) and (line_min_lat > min_lat) and (line_max_lon < max_lon) and \
                         (line_min_lon > min_lon):
                     lines_in_box.append(fq_line)
         return lines_in_box
 
+    def return_line_bounds(self, line: str):
+        """
+        For given line name, return the latitude/longitude boundaries of the line.  These are computed once when the
+        line navigation is loaded (see return_line_navigation) and cached, so that spatial queries do not have to
+        revisit the navigation arrays.
+
+        Parameters
+        ----------
+        line
+            line name
+
+        Returns
+        -------
+        tuple
+            (minimum latitude, maximum latitude, minimum longitude, maximum longitude) in degrees, None if the line
+            is not in the project
+        """
+
+        bounds = self.line_bounds.get(line)
+        if bounds is None:
+            self.return_line_navigation(line)
+            bounds = self.line_bounds.get(line)
+        return bounds
+
     def return_soundings_in_polygon(self, polygon: np.ndarray):
         """
         With the given latitude/longitude polygon, return the soundings that are within the boundaries.  Use the
@@ -758,12 +967,18 @@ class FqprProject:
             dict where keys are the fqpr instance name, values are the sounding values as 1d arrays
         """
         data = {}
-        for fq_name, fq_inst in self.fqpr_instances.items():
+        fq_names = list(self.fqpr_instances.keys())
+        tasks = []
+        for fq_inst in self.fqpr_instances.values():
             fq_inst.ping_filter = []  # reset ping filter for all instances when you try and make a new selection
             # if fq_inst.intersects(polygon[:, 1].min(), polygon[:, 1].max(), polygon[:, 0].min(), polygon[:, 0].max(), geographic=True):  # rely on geohash intersect instead
-            head, x, y, z, tvu, rejected, pointtime, beam = fq_inst.return_soundings_in_polygon(polygon, geographic=True)
+            tasks.append(dask.delayed(fq_inst.return_soundings_in_polygon)(polygon, geographic=True))
+        # each query sets the ping_filter on its fqpr instance, so these have to run on local threads, not on the cluster
+        results = dask.compute(*tasks, scheduler='threads')
+        for fq_name, result in zip(fq_names, results):
+            head, x, y, z, tvu, rejected, pointtime, beam = result
             if x is not None:
-                linenames = fq_inst.return_lines_for_times(pointtime)
+                linenames = self.fqpr_instances[fq_name].return_lines_for_times(pointtime)
                 data[fq_name] = [head, x, y, z, tvu, rejected, pointtime, beam, linenames]
         return data
 
@@ -784,7 +999,8 @@ class FqprProject:
     def get_fqpr_by_serial_number(self, primary_serial_number: int, secondary_serial_number: int, same_day_as: datetime = None):
         """
         Find the fqpr instance that matches the provided serial number.  Should just be one instance in a project with
-        the same serial number, if there are more, that is going to be a problem.
+        the same serial number (on the same day), this is checked when the project is loaded, see
+        _check_serial_number_index.  The first match is returned.
 
         Parameters
         ----------
@@ -805,41 +1021,59 @@ class FqprProject:
             fqpr instance that matches the serial numbers provided
         """
 
-        out_path = None
-        out_instance = None
-        matches = 0
-        for fqpr_path, fqpr_instance in self.fqpr_instances.items():
-            if primary_serial_number in fqpr_instance.multibeam.raw_ping[0].system_serial_number:
-                if secondary_serial_number in fqpr_instance.multibeam.raw_ping[0].secondary_system_serial_number:
-                    if same_day_as:
-                        fq_day = datetime.fromtimestamp(fqpr_instance.multibeam.raw_ping[0].time.values[0], tz=timezone.utc)
-                        if fq_day.timetuple().tm_yday != same_day_as.timetuple().tm_yday:
-                            continue
-                    out_path = self.absolute_path_from_relative(fqpr_path)
-                    out_instance = fqpr_instance
-                    matches += 1
-        if matches > 1:
-            raise ValueError("Found {} matches by serial number, project should not have multiple fqpr instances with the same serial number".format(matches))
-        return out_path, out_instance
+        target_day = None
+        if same_day_as:
+            if same_day_as.tzinfo is None:  # naive datetimes are taken to be utc, same as the ping times
+                same_day_as = same_day_as.replace(tzinfo=timezone.utc)
+            target_day = int(same_day_as.timestamp() // 86400)  # days since the epoch
+        for fqpr_path in self._serial_index.get((primary_serial_number, secondary_serial_number), []):
+            if target_day is not None and int(self._fqpr_first_time[fqpr_path] // 86400) != target_day:
+                continue
+            return self.absolute_path_from_relative(fqpr_path), self.fqpr_instances[fqpr_path]
+        return None, None
+
+    def _check_serial_number_index(self):
+        """
+        One time integrity check run after loading a project.  A project should not have multiple fqpr instances with
+        the same serial number that start on the same day, get_fqpr_by_serial_number will only ever return the first
+        one.  Print a warning for any that are found.
+        """
+
+        for (primary_serial_number, secondary_serial_number), fqpr_paths in self._serial_index.items():
+            if len(fqpr_paths) > 1:
+                by_day = {}
+                for fqpr_path in fqpr_paths:
+                    fq_day = int(self._fqpr_first_time[fqpr_path] // 86400)  # days since the epoch
+                    by_day.setdefault(fq_day, []).append(fqpr_path)
+                for day_paths in by_day.values():
+                    if len(day_paths) > 1:
+                        print('Warning: Found {} fqpr instances with serial number {}/{} on the same day, project should not have multiple fqpr instances with the same serial number: {}'.format(
+                            len(day_paths), primary_serial_number, secondary_serial_number, day_paths))
 
     def return_vessel_file(self):
         """
-        Return the VesselFile instance for this project's vessel_file path
+        Return the VesselFile instance for this project's vessel_file path.  The instance is reused until the file on
+        disk changes (modified time or size), so repeated calls do not reload the file.
 
         Returns
         -------
         VesselFile
-            Instance of VesselFile for the vessel_file attribute path.  If self.vessel_file is not set, this returns
-            None
+            Instance of VesselFile for the vessel_file attribute path.  If self.vessel_file is not set or the file does
+            not exist, this returns None
         """
 
-        if self.vessel_file:
-            if os.path.exists(self.vessel_file):
-                vf = VesselFile(self.vessel_file)
-            else:
-                vf = None
-        else:
-            vf = None
+        if not self.vessel_file:
+            return None
+        try:
+            st = os.stat(self.vessel_file)
+        except FileNotFoundError:
+            return None
+        if self._vessel_file_cache is not None:
+            cached_path, cached_mtime, cached_size, vf = self._vessel_file_cache
+            if cached_path == self.vessel_file and cached_mtime == st.st_mtime_ns and cached_size == st.st_size:
+                return vf
+        vf = VesselFile(self.vessel_file)
+        self._vessel_file_cache = (self.vessel_file, st.st_mtime_ns, st.st_size, vf)
         return vf
 
     def return_surface_containers(self, surface_name: str, relative_path: bool = True):
@@ -875,21 +1109,25 @@ class FqprProject:
             print('Surface {} not found in project'.format(surface_name))
             return [], []
         existing_container_names = surf.return_unique_containers()
-        existing_needs_update = []
+        # containers are added as the fqpr container name plus a chunk index, ex: 'em2040_389_07_10_2019_0' (see
+        #   fqpr_convenience._add_points_to_surface), keep the timestamp of the first chunk for each fqpr container name
+        container_times = {}
+        for ename, etime in surf.container_timestamp.items():
+            container_times.setdefault(ename.rsplit('_', 1)[0], etime)
+        existing_needs_update = set()
         for existname in existing_container_names:
             if existname in self.fqpr_instances:
-                existtime = None
-                for ename, etime in surf.container_timestamp.items():
-                    if ename.find(existname) != -1:
-                        existtime = datetime.strptime(etime, '%Y%m%d_%H%M%S')
-                        break
+                existtime = container_times.get(existname)
                 if existtime:
+                    existtime = datetime.strptime(existtime, '%Y%m%d_%H%M%S')
                     last_time = self.fqpr_instances[existname].last_operation_date
                     if last_time > existtime:
-                        existing_needs_update.append(existname)
-        existing_container_names = [exist if exist not in existing_needs_update else exist + '*' for exist in existing_container_names]
-        possible_container_names = [os.path.split(fqpr_inst.multibeam.raw_ping[0].output_path)[1] for fqpr_inst in self.fqpr_instances.values()]
-        possible_container_names = [pname for pname in possible_container_names if (pname not in existing_container_names) and (pname + '*' not in existing_container_names)]
+                        existing_needs_update.add(existname)
+        # names without the asterisk, a container is either already in the surface (as is or out of date) or possible
+        existing_names = set(existing_container_names)
+        if existing_needs_update:
+            existing_container_names = [exist + '*' if exist in existing_needs_update else exist for exist in existing_container_names]
+        possible_container_names = [pname for pname in self._container_names.values() if pname not in existing_names]
         return existing_container_names, possible_container_names
 
 
@@ -956,3 +1194,25 @@ def return_project_data(project_path: str):
     fqp = FqprProject()
     data = fqp._load_project_file(project_path)
     return data
+
+
+def _path_exists_or_warn(pth: str):
+    """
+    Check that the provided path exists, printing a warning if it does not.  Used to filter the paths loaded from the
+    project file.
+
+    Parameters
+    ----------
+    pth
+        absolute file path
+
+    Returns
+    -------
+    bool
+        True if the path exists
+    """
+
+    exists = os.path.exists(pth)
+    if not exists:
+        print('Unable to find {}'.format(pth))
+    return exists
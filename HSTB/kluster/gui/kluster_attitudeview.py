@@ -3,9 +3,10 @@ import pyqtgraph as pg
 import numpy as np
 import xarray as xr
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from HSTB.kluster.xarray_helpers import return_chunk_slices
-from HSTB.kluster.fqpr_convenience import reload_data
 
 
 class KlusterAttitudeView(pg.GraphicsLayoutWidget):
@@ -24,6 +25,8 @@ class KlusterAttitudeView(pg.GraphicsLayoutWidget):
         self.setWindowTitle('Kluster Attitude View')
 
         self.pts_per_plot = 1000
+        # fastest refresh rate of the plots in milliseconds, the plots refresh at the logging rate of the data up to this
+        self.min_refresh_ms = 15
 
         self.roll_plot = None
         self.pitch_plot = None
@@ -35,21 +38,32 @@ class KlusterAttitudeView(pg.GraphicsLayoutWidget):
         self.data = None
         self.data_slices = None
         self.data_chunk_instances = []
+        self.chunk_time = None
+        self.chunk_channels = []
+        self.plot_time_instance = None
         self.plot_data_instances = []
         self.plot_data_ids = []
 
         self.data_ptr = 0
         self.data_slice_index = 0
+        self.next_boundary = 0
         self.plot_pts = 0
+        self.ring_idx = 0
+        self.nominal_hz = 1000 / self.min_refresh_ms
+        self.last_tick_time = 0.0
 
         self.timer = None
 
+        # computes the next chunk in the background while the current one is plotted, see prefetch_chunk
+        self.prefetch_executor = None
+        self.prefetch_future = None
+
         self.build_plots()
 
     def initialize_datastore(self):
         """
-        We hold the data for each chunk (and the next one is also buffered) so that it is available to the plot.  Clear
-        out the datastore or build it for the first time here.
+        We hold the data for each chunk (and the next one is computed in the background) so that it is available to
+        the plot.  Clear out the datastore or build it for the first time here.
 
         """
         self.active_curves = []
@@ -57,12 +71,20 @@ class KlusterAttitudeView(pg.GraphicsLayoutWidget):
         self.data = None
         self.data_slices = None
         self.data_chunk_instances = []
+        self.chunk_time = None
+        self.chunk_channels = []
+        self.plot_time_instance = None
         self.plot_data_instances = []
         self.plot_data_ids = []
 
         self.data_ptr = 0
         self.data_slice_index = 0
+        self.next_boundary = 0
         self.plot_pts = 0
+        self.ring_idx = 0
+        self.nominal_hz = 1000 / self.min_refresh_ms
+        self.last_tick_time = 0.0
+        self.prefetch_future = None
 
         self.timer = None
 
@@ -105,16 +127,22 @@ class KlusterAttitudeView(pg.GraphicsLayoutWidget):
         # newplot.setLimits(xMax=self.pts_per_plot)
         return newplot
 
-    def initialize_data(self, xarr):
+    def initialize_data(self, xarr, first_chunk: tuple = None):
         """
         Takes in an xarray object and builds the data indices.  data_chunk_instances will hold the computed dask
         array data.  We want to compute here because otherwise, each update is going to ask the dask array to compute
         for a single time, which adds overhead.  This frontloads that work.
 
+        The computed chunks are held as plain numpy arrays (see compute_chunk), chunk_time and chunk_channels are the
+        arrays for the chunk currently being plotted.  The next chunk is computed on the prefetch_executor thread, so
+        that the timer driving update_plot is not held up waiting on dask when we move to the next chunk.
+
         Parameters
         ----------
         xarr: xarray Dataset object, representing raw attitude as generated by Kluster.  Can be generated in other
               ways, see main statement for test dataset.
+        first_chunk: optional, the already computed first chunk of xarr (see compute_chunk), used when update_plot
+              starts the plot over, so that we do not have to compute it here
 
         """
         if xarr is not None:
@@ -123,27 +151,88 @@ class KlusterAttitudeView(pg.GraphicsLayoutWidget):
             self.data_slices = return_chunk_slices(xarr)
             self.data_slice_index = 0
             self.data_ptr = 0
-            self.data_chunk_instances.append(xarr.isel(time=self.data_slices[0]).compute())
-            if len(self.data_slices) > 1:
-                self.data_chunk_instances.append(xarr.isel(time=self.data_slices[1]).compute())
+            self.plot_data_ids = ['roll', 'pitch', 'heave', 'heading']
+            if first_chunk is None:
+                first_chunk = self.compute_chunk(xarr, self.data_slices[0])
+            self.data_chunk_instances.append(first_chunk)
+            self.prefetch_chunk(1)
+            self.chunk_time, self.chunk_channels = self.data_chunk_instances[0]
+            self.next_boundary = self.data_slices[0].stop
+            if self.chunk_time.size > 1 and self.chunk_time[-1] > self.chunk_time[0]:
+                self.nominal_hz = (self.chunk_time.size - 1) / (self.chunk_time[-1] - self.chunk_time[0])
+            else:
+                self.nominal_hz = 1000 / self.min_refresh_ms
             if self.pts_per_plot > self.data_slices[0].stop:
                 self.plot_pts = self.data_slices[0].stop
             else:
                 self.plot_pts = self.pts_per_plot
 
-            self.plot_data_instances = [np.empty((self.plot_pts, 2)), np.empty((self.plot_pts, 2)),
-                                        np.empty((self.plot_pts, 2)), np.empty((self.plot_pts, 2))]
-            self.plot_data_ids = ['roll', 'pitch', 'heave', 'heading']
+            # the plot buffers are ring buffers that hold two copies of the plotted points, each new point is written
+            #   to both halves so that the points in order are always the contiguous slice [ring_idx:ring_idx + plot_pts],
+            #   see update_plot.  All four plots share the one time buffer, with a value buffer for each plot.
+            self.plot_time_instance = np.empty(2 * self.plot_pts)
+            self.plot_data_instances = [np.empty(2 * self.plot_pts), np.empty(2 * self.plot_pts),
+                                        np.empty(2 * self.plot_pts), np.empty(2 * self.plot_pts)]
+            self.ring_idx = 0
+
+    def compute_chunk(self, xarr: xr.Dataset, data_slice: slice):
+        """
+        Compute the chunk of the attitude dataset at the provided slice and pull out the time and the plotted channels
+        as contiguous numpy arrays, so that update_plot can index them directly without going through xarray for
+        every point.  Runs on the prefetch_executor thread for all but the first chunk.
+
+        Parameters
+        ----------
+        xarr
+            xarray Dataset object, the raw attitude
+        data_slice
+            slice of the chunk, one of the data_slices
+
+        Returns
+        -------
+        np.ndarray
+            1d array of the chunk times
+        list
+            list of 1d arrays, one for each of the plot_data_ids
+        """
+
+        chunk = xarr.isel(time=data_slice).compute()
+        chunk_time = np.ascontiguousarray(chunk.time.values, dtype=np.float64)
+        chunk_channels = [np.ascontiguousarray(chunk[dataid].values, dtype=np.float64) for dataid in self.plot_data_ids]
+        return chunk_time, chunk_channels
+
+    def prefetch_chunk(self, slice_index: int):
+        """
+        Start computing the chunk at the provided index of data_slices in the background.  update_plot picks up the
+        result when it reaches the end of the current chunk.  The index wraps around, the chunk after the last chunk is
+        the first chunk, as the plot starts over at the end of the data.  Any prefetch still pending from a previous
+        dataset is cancelled.
+
+        Parameters
+        ----------
+        slice_index
+            index of the chunk in data_slices
+        """
+
+        if self.prefetch_future is not None:  # a prefetch for data that we are no longer plotting
+            self.prefetch_future.cancel()
+        if self.prefetch_executor is None:
+            self.prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self.prefetch_future = self.prefetch_executor.submit(self.compute_chunk, self.data,
+                                                             self.data_slices[slice_index % len(self.data_slices)])
 
     def start_plotting(self):
         """
-        Kicks off the timer that runs the update.  I set the current refresh rate to an arbitrary 15ms.  This should
-        probably be tied to the inherent logging rate of the xarray object feeding the plot.
+        Kicks off the timer that runs the update.  The refresh rate is the logging rate of the xarray object feeding
+        the plot (nominal_hz), limited to one refresh every min_refresh_ms.  update_plot will catch up on any samples
+        logged between refreshes, so the plot stays in step with the data time.
 
         """
         self.timer = pg.QtCore.QTimer()
+        self.timer.setTimerType(pg.QtCore.Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_plot)
-        self.timer.start(15)
+        self.last_tick_time = time.perf_counter()
+        self.timer.start(max(self.min_refresh_ms, int(1000 / self.nominal_hz)))
 
     def stop_plotting(self):
         """
@@ -153,82 +242,106 @@ class KlusterAttitudeView(pg.GraphicsLayoutWidget):
             if self.timer.isActive():
                 self.timer.stop()
 
+    def closeEvent(self, event):
+        """
+        On closing the widget, stop the plotting and shut down the prefetch worker thread.  The worker is started again
+        if new data is plotted.
+        """
+        self.stop_plotting()
+        if self.prefetch_future is not None:
+            self.prefetch_future.cancel()
+            self.prefetch_future = None
+        if self.prefetch_executor is not None:
+            self.prefetch_executor.shutdown(wait=False)
+            self.prefetch_executor = None
+        super().closeEvent(event)
+
     def update_plot(self):
         """
         Data will come in chunked in some size that makes sense to the dask array (self.data_slices)
         We want chunks the length of the plot for display purposes (self.plot_pts) so we can show scrolling plots
         update_plot will:
          - build the lineplot objects and store them in active_curves
-         - take the next dask array chunk, compute it, and hold it in data_chunk_instances (along with the current
-                 dask chunk that was appended in initialize_data)
+         - at the end of a chunk, swap in the next dask array chunk (computed in the background, see prefetch_chunk)
+                 and start computing the one after it
          - plot a chunk of that chunk, starting at index data_ptr and of length self.plot_pts
-         - append a new value and remove the first value of that chunk every run of this method
+         - overwrite the oldest values in the plot ring buffer with the samples logged since the last run of this
+                 method (at least one), so that if an update runs late we skip ahead rather than fall behind
          - re-intialize at the end of the array so that the plot starts over and runs indefinitely
 
         """
-        slice_end = self.data_slices[self.data_slice_index].stop
-        end_of_chunk = not self.data_ptr % slice_end
-        if end_of_chunk:
+        if self.data_ptr == 0 or self.data_ptr == self.next_boundary:
             if self.data_ptr != 0:
                 # next chunk
-                self.clear_data()
                 if self.data_ptr == self.data_slices[-1].stop:
-                    # end of chunks
-                    self.initialize_data(self.data)
+                    # end of chunks, start over with the first chunk, prefetched when we moved into the last chunk
+                    self.initialize_data(self.data, first_chunk=self.prefetch_future.result())
                     return
+                # usually already finished, as it has been computing for the whole of the last chunk
+                next_chunk = self.prefetch_future.result()
+                self.clear_data()
                 self.data_slice_index += 1
-                self.data_chunk_instances.append(self.data.isel(time=self.data_slices[self.data_slice_index + 1]).compute())
+                self.data_chunk_instances.append(next_chunk)
+                self.prefetch_chunk(self.data_slice_index + 1)
+                self.chunk_time, self.chunk_channels = self.data_chunk_instances[0]
+                self.next_boundary = self.data_slices[self.data_slice_index].stop
 
             self.active_curves = [self.roll_plot.plot(), self.pitch_plot.plot(), self.heave_plot.plot(),
                                   self.heading_plot.plot()]
 
         if self.data_ptr == 0:
-            curr_time_idx = slice(self.data_ptr, self.data_ptr + self.plot_pts)
-            self.data_ptr += self.plot_pts
-            raw_att = self.data_chunk_instances[0].isel(time=curr_time_idx)
-            for cnt, curv in enumerate(self.active_curves):
-                tmp = self.plot_data_instances[cnt]
-                tmp[:, 0] = raw_att.time
-                tmp[:, 1] = raw_att[self.plot_data_ids[cnt]]
-                self.plot_data_instances[cnt] = tmp
-                curv.setData(x=tmp[:, 0], y=tmp[:, 1])
+            plot_pts = self.plot_pts
+            self.data_ptr = plot_pts
+            self.ring_idx = 0
+            self.last_tick_time = time.perf_counter()
+            # fill both halves of the ring buffers straight from the first plot_pts of the chunk arrays
+            time_buf = self.plot_time_instance
+            time_buf[:plot_pts] = time_buf[plot_pts:] = self.chunk_time[:plot_pts]
+            for buf, channel, curv in zip(self.plot_data_instances, self.chunk_channels, self.active_curves):
+                buf[:plot_pts] = buf[plot_pts:] = channel[:plot_pts]
+                curv.setData(x=time_buf[:plot_pts], y=buf[:plot_pts])
         else:
-            curr_time_idx = self.data_ptr - self.data_slices[self.data_slice_index].start
-            self.data_ptr += 1
-            raw_att = self.data_chunk_instances[0].isel(time=curr_time_idx)
-            for cnt, curv in enumerate(self.active_curves):
-                tmp = self.plot_data_instances[cnt]
-                tmp[:-1] = self.plot_data_instances[cnt][1:]
-                tmp[-1, 0] = float(raw_att.time)
-                tmp[:-1, 1] = self.plot_data_instances[cnt][1:, 1]
-                tmp[-1, 1] = float(raw_att[self.plot_data_ids[cnt]])
-                self.plot_data_instances[cnt] = tmp
-                curv.setData(x=tmp[:, 0], y=tmp[:, 1])
+            plot_pts = self.plot_pts
+            # number of samples logged since the last update, never past the end of the chunk or more than we show
+            elapsed = time.perf_counter() - self.last_tick_time
+            num_samples = max(1, min(int(elapsed * self.nominal_hz), self.next_boundary - self.data_ptr, plot_pts))
+            self.last_tick_time += num_samples / self.nominal_hz
+            chunk_idx = self.data_ptr - self.data_slices[self.data_slice_index].start
+            curr_time_idx = slice(chunk_idx, chunk_idx + num_samples)
+            self.data_ptr += num_samples
+            # overwrite the oldest points (in both halves of the ring buffer), the oldest point is then the one after
+            write_idx = (self.ring_idx + np.arange(num_samples)) % plot_pts
+            mirror_idx = write_idx + plot_pts
+            self.ring_idx = read_idx = (self.ring_idx + num_samples) % plot_pts
+            time_buf = self.plot_time_instance
+            time_buf[write_idx] = time_buf[mirror_idx] = self.chunk_time[curr_time_idx]
+            plotted_time = time_buf[read_idx:read_idx + plot_pts]
+            for buf, channel, curv in zip(self.plot_data_instances, self.chunk_channels, self.active_curves):
+                buf[write_idx] = buf[mirror_idx] = channel[curr_time_idx]
+                curv.setData(x=plotted_time, y=buf[read_idx:read_idx + plot_pts])
 
     def clear_data(self):
         """
         update_plot will continuously load one chunk of data at a time and plot the data to the four plots.  After
         a chunk is finished, we need to remove it from the list and clear the plots.
 
-        If there is no data, we just continue on.
+        If the plots have not been built yet, there is nothing to clear.
 
         """
-        try:  # clear out any existing chunks
-            self.data_chunk_instances = []
-        except IndexError:
-            pass
+        # clear out any existing chunks
+        self.data_chunk_instances.clear()
 
-        try:  # remove any existing lines from the plot
-            self.active_curves = []
-            self.roll_plot.clear()
-            self.pitch_plot.clear()
-            self.heave_plot.clear()
-            self.heading_plot.clear()
-        except IndexError:
-            pass
+        # remove any existing lines from the plot
+        self.active_curves = []
+        for plt in (self.roll_plot, self.pitch_plot, self.heave_plot, self.heading_plot):
+            if plt is not None:
+                plt.clear()
 
 
 if __name__ == '__main__':
+    # only needed to load the test dataset, importing fqpr_convenience brings in all of the processing modules
+    from HSTB.kluster.fqpr_convenience import reload_data
+
     try:  # pyside2
         app = QtWidgets.QApplication()
     except TypeError:  # pyqt5
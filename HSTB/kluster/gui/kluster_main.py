@@ -432,7 +432,8 @@ class KlusterMain(QtWidgets.QMainWindow):
                 updated_type, new_data, new_project = None, True, None
 
             if new_project:  # user added a data file when there was no project, so we loaded or created a new one
-                new_fqprs.extend([fqpr for fqpr in self.project.fqpr_instances.keys() if fqpr not in new_fqprs])
+                existing_fqprs = set(new_fqprs)
+                new_fqprs.extend([fqpr for fqpr in self.project.fqpr_instances.keys() if fqpr not in existing_fqprs])
             if new_data is None:
                 if os.path.exists(os.path.join(f, 'SRGrid_Root')) or os.path.exists(os.path.join(f, 'VRGridTile_Root')):
                     potential_surface_paths.append(f)
@@ -18,6 +18,10 @@ last_change_buffer_size = 50
 # _qgis backend
 qgis_epsg = 4326
 
+# fqpr_project
+max_line_navigation_points = 2000  # line navigation is downsampled to at most this many points when buffered for display
+max_project_load_workers = 8  # maximum number of threads used to reload converted data when opening a project
+
 # generic processing
 max_beams = 400  # starting max beams in kluster (can grow beyond)
 epsg_nad83 = 6318
@@ -1,10 +1,13 @@
 import logging
 import sys
 import os
+import threading
 from datetime import datetime
 
 loglevel = logging.INFO
 log_counter = 0
+# guards log_counter, data can be loaded on multiple threads at once (see fqpr_project) and each logger must be unique
+log_counter_lock = threading.Lock()
 
 
 class StdErrFilter(logging.Filter):
@@ -61,8 +64,9 @@ def return_logger(name, logfile):
     """
     global log_counter
     fmat = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    logger = logging.getLogger(name + str('_') + str(log_counter))
-    log_counter += 1
+    with log_counter_lock:
+        logger = logging.getLogger(name + str('_') + str(log_counter))
+        log_counter += 1
     logger.setLevel(loglevel)
 
     consolelogger = logging.StreamHandler(sys.stdout)
@@ -65,6 +65,7 @@ REQUIRED = [
 # What packages are optional?
 EXTRAS = {
           'entwine export': ['entwine', 'nodejs'],
+          'fast project file': ['orjson'],
           }
 
 # The rest you shouldn't have to touch too much :)
@@ -1,8 +1,11 @@
 import time
 import shutil
+import json
+from datetime import datetime, timedelta, timezone
 
 from HSTB.kluster.fqpr_intelligence import *
 from HSTB.kluster.fqpr_project import *
+from HSTB.kluster.fqpr_convenience import convert_multibeam, process_multibeam, generate_new_surface
 
 
 def get_testfile_paths():
@@ -25,6 +28,29 @@ def cleanup_after_tests():
         shutil.rmtree(expected_data_folder_path)
 
 
+def setup_container_project(container_names: list):
+    """
+    Convert the test file once for each of the provided container names, all in one project folder, and build a new
+    project from that folder.  Returns the project and the project folder.
+    """
+
+    testfile, testsv, expected_data_folder, expected_data_folder_path = get_testfile_paths()
+    proj_folder = os.path.join(os.path.dirname(testfile), 'container_project')
+    if os.path.exists(proj_folder):
+        shutil.rmtree(proj_folder)
+    for cont_name in container_names:
+        fq = convert_multibeam(testfile, outfold=os.path.join(proj_folder, cont_name), skip_dask=True, show_progress=False)
+        fq.close()
+    proj = create_new_project(proj_folder)
+    return proj, proj_folder
+
+
+def cleanup_container_project(proj: FqprProject, proj_folder: str):
+    proj.close()
+    if os.path.exists(proj_folder):
+        shutil.rmtree(proj_folder)
+
+
 def setup_intel(include_vessel_file=True):
     testfile, testsv, expected_data_folder, expected_data_folder_path = get_testfile_paths()
 
@@ -342,6 +368,127 @@ def test_intel_vessel_file():
     proj = None
     cleanup_after_tests()
 
+
+def test_open_project_multiple_containers():
+    container_names = ['convert1', 'convert2', 'convert3']
+    proj, proj_folder = setup_container_project(container_names)
+    # the containers in the folder are all loaded at once, see FqprProject._add_fqprs_in_parallel
+    assert sorted(proj.return_fqpr_paths()) == container_names
+    proj_path = proj.path
+    proj.close()
+
+    # and the same when opening the saved project
+    proj = open_project(proj_path)
+    assert sorted(proj.return_fqpr_paths()) == container_names
+    loggers = [fq.multibeam.logger for fq in proj.fqpr_instances.values()]
+    # each instance gets its own logger, writing to the log file in its own container
+    assert len(set(logger.name for logger in loggers)) == len(container_names)
+    for relpath, fq in proj.fqpr_instances.items():
+        file_handlers = [hndlr for hndlr in fq.multibeam.logger.handlers if isinstance(hndlr, logging.FileHandler)]
+        assert len(file_handlers) == 1
+        assert os.path.dirname(file_handlers[0].baseFilename) == proj.absolute_path_from_relative(relpath)
+
+    cleanup_container_project(proj, proj_folder)
+
+
+def test_setup_project_over_existing_file():
+    container_names = ['convert1', 'convert2']
+    proj, proj_folder = setup_container_project(container_names)
+    proj.set_settings({'use_epsg': True, 'epsg': 26910})
+    proj_path = proj.path
+    proj.close()
+
+    # setting up a new project where there is already a project file opens the existing project, so saving does not
+    #   drop the containers and settings in the file
+    proj = FqprProject()
+    proj._setup_new_project(proj_folder)
+    assert proj.path == proj_path
+    assert sorted(proj.return_fqpr_paths()) == container_names
+    proj.save_project()
+    data = return_project_data(proj_path)
+    assert sorted(data['fqpr_paths']) == [proj.absolute_path_from_relative(cont) for cont in container_names]
+    assert data['use_epsg']
+    assert data['epsg'] == 26910
+
+    cleanup_container_project(proj, proj_folder)
+
+
+def test_load_project_file_missing_paths():
+    testfile, testsv, expected_data_folder, expected_data_folder_path = get_testfile_paths()
+    proj_folder = os.path.join(os.path.dirname(testfile), 'missing_paths_project')
+    if os.path.exists(proj_folder):
+        shutil.rmtree(proj_folder)
+    os.makedirs(os.path.join(proj_folder, 'convert_exists'))
+    proj_path = os.path.join(proj_folder, 'kluster_project.json')
+    with open(proj_path, 'w') as pf:
+        json.dump({'file_format': 1.0, 'vessel_file': None, 'surface_paths': [],
+                   'fqpr_paths': ['convert_missing_one', 'convert_missing_two', 'convert_exists']}, pf)
+
+    # consecutive missing paths must all be dropped, only the existing path is kept
+    data = return_project_data(proj_path)
+    assert data['fqpr_paths'] == [os.path.abspath(os.path.join(proj_folder, 'convert_exists'))]
+    assert data['surface_paths'] == []
+
+    shutil.rmtree(proj_folder)
+
+
+def test_get_fqpr_by_serial_number():
+    proj, proj_folder = setup_container_project(['convert1'])
+    fq = proj.fqpr_instances['convert1']
+    rp = fq.multibeam.raw_ping[0]
+    primary_serial_number = int(rp.system_serial_number[0])
+    secondary_serial_number = int(rp.secondary_system_serial_number[0])
+    first_ping_time = datetime.fromtimestamp(float(rp.time.values[0]), tz=timezone.utc)
+    expected_path = proj.absolute_path_from_relative('convert1')
+
+    fqpr_path, fqpr_instance = proj.get_fqpr_by_serial_number(primary_serial_number, secondary_serial_number)
+    assert fqpr_path == expected_path
+    assert fqpr_instance is fq
+    fqpr_path, fqpr_instance = proj.get_fqpr_by_serial_number(primary_serial_number, secondary_serial_number,
+                                                              same_day_as=first_ping_time)
+    assert fqpr_path == expected_path
+    # naive datetimes are taken as utc
+    fqpr_path, fqpr_instance = proj.get_fqpr_by_serial_number(primary_serial_number, secondary_serial_number,
+                                                              same_day_as=first_ping_time.replace(tzinfo=None))
+    assert fqpr_path == expected_path
+    # same day of the year, but a different year, does not match
+    assert proj.get_fqpr_by_serial_number(primary_serial_number, secondary_serial_number,
+                                          same_day_as=first_ping_time.replace(year=first_ping_time.year + 1)) == (None, None)
+    assert proj.get_fqpr_by_serial_number(primary_serial_number, secondary_serial_number,
+                                          same_day_as=first_ping_time + timedelta(days=1)) == (None, None)
+    assert proj.get_fqpr_by_serial_number(primary_serial_number + 1, secondary_serial_number) == (None, None)
+
+    cleanup_container_project(proj, proj_folder)
+
+
+def test_return_surface_containers():
+    # one container name is a prefix of the other, the surface timestamps must be matched by the full container name
+    proj, proj_folder = setup_container_project(['convert1', 'convert10'])
+    fq_one = process_multibeam(proj.fqpr_instances['convert1'], coord_system='NAD83')
+    fq_ten = process_multibeam(proj.fqpr_instances['convert10'], coord_system='NAD83')
+    # convert10 goes in first, so its containers come first in the surface container_timestamp
+    surf = generate_new_surface([fq_ten, fq_one], resolution=8.0, output_path=os.path.join(proj_folder, 'surface'))
+    proj.add_surface(surf)
+    surface_path = proj.path_relative_to_project(surf.output_folder)
+
+    existing_container_names, possible_container_names = proj.return_surface_containers(surface_path)
+    # surface was built after processing, nothing is out of date
+    assert sorted(existing_container_names) == ['convert1', 'convert10']
+    assert possible_container_names == []
+
+    # make the convert10 points older than the last processing and the convert1 points newer.  Only convert10 is out
+    #   of date, convert1 must not pick up the timestamp of the convert10 containers
+    for cont_name in surf.container_timestamp:
+        if cont_name.rsplit('_', 1)[0] == 'convert10':
+            surf.container_timestamp[cont_name] = '20000101_000000'
+        else:
+            surf.container_timestamp[cont_name] = '29990101_000000'
+    existing_container_names, possible_container_names = proj.return_surface_containers(surface_path)
+    assert sorted(existing_container_names) == ['convert1', 'convert10*']
+    assert possible_container_names == []
+
+    cleanup_container_project(proj, proj_folder)
+
 # some issue with pytest hanging when we use the folder monitoring stuff
 # not sure what to do here, stopping/joining the observer is what the docs say to do
 
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from HSTB.kluster.logging_conf import *
 
 
@@ -11,3 +12,16 @@ def test_return_logger():
     assert logger.level == logging.INFO
     assert logger.name[0:9] == 'test_log_'
     logger = None
+
+
+def test_return_logger_threaded():
+    nme = 'test_log_threaded'
+    logfile = None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        loggers = list(executor.map(lambda x: return_logger(nme, logfile), range(64)))
+
+    # each call must get its own logger, otherwise handlers from separate instances end up on the same logger
+    assert len(set(logger.name for logger in loggers)) == 64
+    assert all(len(logger.handlers) == 2 for logger in loggers)
+    loggers = None